@@ -1,22 +1,115 @@
 import os
 import json
+import stat
 import time
+import mmap
+import pickle
+import hashlib
+import tempfile
+import queue
+import signal
 import logging
 import argparse
-from datetime import datetime, timedelta
+import functools
+import contextlib
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 import pydicom
+from pydicom.tag import Tag
 import requests
-import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+import sys
 import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Parsed settings are shared between monitor processes on the same host
+# through a pickle in shared memory, keyed by the settings file and a digest of
+# its text. The cache is only used where the owner of a cache file can be
+# checked; elsewhere (Windows) settings are always parsed from JSON.
+SETTINGS_CACHE_DIR = None
+if hasattr(os, 'getuid'):
+    SETTINGS_CACHE_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _settings_cache_prefix(settings_file):
+    path_digest = hashlib.sha256(os.path.abspath(settings_file).encode('utf-8')).hexdigest()[:16]
+    return f"dicom_monitor_settings.{path_digest}."
+
+
+def _read_cached_settings(cache_file):
+    try:
+        # Only trust a regular file written by this user under this name: do
+        # not follow symlinks, and reject hardlinks to other files (such as a
+        # received DICOM whose preamble the sender controls).
+        fd = os.open(cache_file, os.O_RDONLY | os.O_NOFOLLOW)
+        with open(fd, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if st.st_uid != os.getuid() or not stat.S_ISREG(st.st_mode) or st.st_nlink != 1:
+                logging.warning(f"Ignoring untrusted settings cache '{cache_file}'.")
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return pickle.loads(m)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable settings cache '{cache_file}': {e}")
+        return None
+
+
+def _write_cached_settings(cache_file, settings):
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=SETTINGS_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(settings, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_file)
+        return True
+    except Exception as e:
+        logging.warning(f"Failed to write settings cache '{cache_file}': {e}")
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+        return False
+
+
+def _remove_stale_cached_settings(cache_prefix, cache_file):
+    # Drop pickles left behind by earlier versions of the same settings file,
+    # which would otherwise stay in RAM-backed /dev/shm until reboot.
+    try:
+        with os.scandir(SETTINGS_CACHE_DIR) as it:
+            stale = [
+                entry.path for entry in it
+                if entry.name.startswith(cache_prefix) and entry.path != cache_file
+            ]
+    except OSError:
+        return
+    for path in stale:
+        with contextlib.suppress(OSError):
+            if os.stat(path, follow_symlinks=False).st_uid == os.getuid():
+                os.unlink(path)
 
 
 def load_settings(settings_file):
     try:
         with open(settings_file, "r") as f:
-            settings = json.load(f)
-            return settings
+            text = f.read()
+        if SETTINGS_CACHE_DIR is None:
+            return json.loads(text)
+
+        cache_prefix = _settings_cache_prefix(settings_file)
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        cache_file = os.path.join(SETTINGS_CACHE_DIR, f"{cache_prefix}{digest}.pkl")
+        settings = _read_cached_settings(cache_file)
+        if settings is None:
+            settings = json.loads(text)
+            if _write_cached_settings(cache_file, settings):
+                _remove_stale_cached_settings(cache_prefix, cache_file)
+        return settings
     except FileNotFoundError:
         logging.error(f"Settings file '{settings_file}' not found.")
         return []
@@ -24,42 +117,232 @@ def load_settings(settings_file):
         logging.error(f"Error decoding JSON from the settings file '{settings_file}'.")
         return []
 
+
+def _entry_mode_mtime(entry):
+    # One stat call answers both "is it a regular file" and "how old is it".
+    # DirEntry caches its stat result; on Windows it comes straight from the
+    # directory listing without another syscall.
+    st = entry.stat(follow_symlinks=False)
+    return st.st_mode, st.st_mtime
+
+
+# Where the platform has *at() variants (openat/fstatat/unlinkat), the deleter
+# opens, stats and removes everything relative to the already-open parent
+# directory, so the kernel never resolves a full path again.
+_HAVE_DIR_FD = (
+    hasattr(os, 'O_DIRECTORY')
+    and hasattr(os, 'O_NOFOLLOW')
+    and os.scandir in os.supports_fd
+    and {os.open, os.stat, os.unlink, os.rmdir} <= os.supports_dir_fd
+)
+
+
+def _iter_dicom_files(root):
+    # Uses the d_type from each directory entry instead of stat'ing every name.
+    stack = [root]
+    while stack:
+        current_dir = stack.pop()
+        try:
+            with os.scandir(current_dir) as it:
+                entries = list(it)
+        except OSError as e:
+            logging.error(f"Failed to scan directory {current_dir}: {e}")
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.lower().endswith('.dcm'):
+                yield entry
+
+
+def _count_dirs(root):
+    count = 0
+    stack = [root]
+    while stack:
+        current_dir = stack.pop()
+        count += 1
+        try:
+            with os.scandir(current_dir) as it:
+                stack.extend(entry.path for entry in it if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return count
+
+
+def create_observer(watch_dirs):
+    # Returns (observer, use_close_events). inotify needs one watch per
+    # directory, so fall back to polling rather than silently losing events
+    # when the tree would come close to fs.inotify.max_user_watches.
+    if not sys.platform.startswith('linux'):
+        return Observer(), False
+
+    from watchdog.observers.inotify import InotifyObserver
+
+    try:
+        with open('/proc/sys/fs/inotify/max_user_watches') as f:
+            max_user_watches = int(f.read())
+    except (OSError, ValueError):
+        return InotifyObserver(), True
+
+    num_dirs = sum(_count_dirs(watch_dir) for watch_dir in watch_dirs)
+    if num_dirs > max_user_watches * 0.8:
+        logging.warning(
+            f"Watching {num_dirs} directories would exceed 80% of fs.inotify.max_user_watches "
+            f"({max_user_watches}); falling back to polling. Raise the limit to use inotify."
+        )
+        return PollingObserver(timeout=5), False
+    return InotifyObserver(), True
+
+
+_KEEP = bytes(c for c in range(128) if chr(c).isalnum())
+_TABLE = bytes.maketrans(_KEEP, _KEEP.lower())
+_DELETE = bytes(c for c in range(256) if c not in _KEEP)
+
+
 def normalize_string(s):
     # Remove special characters and spaces, convert to lowercase
-    return re.sub(r"[^a-zA-Z0-9]", "", s).lower()
+    return s.encode('ascii', 'ignore').translate(_TABLE, _DELETE).decode('ascii')
+
+
+STUDY_DESCRIPTION_TAG = Tag(0x0008, 0x1030)
+
+
+@functools.lru_cache(maxsize=4096)
+def _study_desc_for(file_path, stat_key):
+    # stat_key (mtime_ns, size) is only part of the cache key, so a file that
+    # has not changed since it was last parsed is never read again.
+    ds = pydicom.dcmread(
+        file_path,
+        specific_tags=[STUDY_DESCRIPTION_TAG],
+        stop_before_pixels=True,
+        defer_size='1 KB',
+    )
+    return normalize_string(getattr(ds, 'StudyDescription', ''))
 
 
 class DicomFileHandler(FileSystemEventHandler):
-    def __init__(self, configs, check_interval, stable_duration, api_check_interval):
-        self.configs = configs
+    def __init__(self, configs, check_interval, stable_duration, upload_workers=8, max_pending_uploads=1024, max_queued_files=8192,
+                 batch_size=1, batch_timeout=0.1, use_close_events=sys.platform.startswith('linux')):
+        self.endpoints_by_study_description = defaultdict(list)
+        for config in configs:
+            norm_config_study_description = normalize_string(config['study_description'])
+            self.endpoints_by_study_description[norm_config_study_description].append(config['api_endpoint'])
         self.check_interval = check_interval
         self.stable_duration = stable_duration
-        self.api_check_interval = api_check_interval
-        self.modified_files = set()
-        self.lock = threading.Lock()
+        # With batch_size > 1, files bound for the same endpoint are sent in
+        # one multipart request; the receiving API has to accept that form.
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.session = self.create_session(len({config['api_endpoint'] for config in configs}))
+        # The inotify backend reports IN_CLOSE_WRITE, so a file is complete as
+        # soon as on_closed fires and no size polling is needed.
+        self.use_close_events = use_close_events
+        self.file_queue = queue.Queue(maxsize=max_queued_files)
+        # Paths currently waiting in file_queue, so repeated events for the
+        # same file are coalesced into a single entry.
+        self.pending_files = set()
+        self.pending_lock = threading.Lock()
         self.stop_event = threading.Event()
-        self.api_thread = threading.Thread(target=self.process_files_periodically)
+        # Uploads run on a worker pool so a slow POST does not hold up event
+        # handling; the semaphore bounds how many files can be waiting on it.
+        self.pool = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix='dcm-upload')
+        self.upload_slots = threading.BoundedSemaphore(max_pending_uploads)
+        self.api_thread = threading.Thread(target=self.process_queued_files)
         self.api_thread.daemon = True
         self.api_thread.start()
 
+    @staticmethod
+    def create_session(num_endpoints):
+        # Keep connections to each endpoint alive across uploads.
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max(num_endpoints, 1),
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2),
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def is_dicom_event(self, event):
+        return not event.is_directory and event.src_path.lower().endswith('.dcm')
+
+    def enqueue_file(self, file_path):
+        with self.pending_lock:
+            if file_path in self.pending_files:
+                return
+            self.pending_files.add(file_path)
+        try:
+            self.file_queue.put_nowait(file_path)
+        except queue.Full:
+            with self.pending_lock:
+                self.pending_files.discard(file_path)
+            logging.error(f"File queue is full, dropping {file_path}")
+
+    def on_closed(self, event):
+        if self.use_close_events and self.is_dicom_event(event):
+            self.enqueue_file(event.src_path)
+
+    def enqueue_when_stable(self, file_path):
+        # Without close events a file only counts as complete once its size
+        # stops changing. It may also vanish while we wait.
+        with self.pending_lock:
+            if file_path in self.pending_files:
+                return
+        try:
+            stable = self.is_file_stable(file_path)
+        except OSError as e:
+            logging.error(f"Failed to check {file_path}: {e}")
+            return
+        if stable:
+            self.enqueue_file(file_path)
+
+    def on_created(self, event):
+        # PollingObserver reports a file written between two snapshots only
+        # as created, never as modified.
+        if not self.use_close_events and self.is_dicom_event(event):
+            self.enqueue_when_stable(event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory or not event.dest_path.lower().endswith('.dcm'):
+            return
+        # A rename into place produces no close-write event; the file is
+        # already complete in that case.
+        if self.use_close_events:
+            self.enqueue_file(event.dest_path)
+        else:
+            self.enqueue_when_stable(event.dest_path)
+
     def on_modified(self, event):
-        if not event.is_directory and event.src_path.lower().endswith('.dcm'):
-            with self.lock:
-                if self.is_file_stable(event.src_path):
-                    self.modified_files.add(event.src_path)
+        if not self.use_close_events and self.is_dicom_event(event):
+            self.enqueue_when_stable(event.src_path)
 
-    def process_files_periodically(self):
+    def process_queued_files(self):
         while not self.stop_event.is_set():
-            with self.lock:
-                files_to_process = list(self.modified_files)
-                self.modified_files.clear()
-
-            for file_path in files_to_process:
-                self.handle_dicom_file(file_path)
-
-            time.sleep(self.api_check_interval)
+            try:
+                file_paths = [self.file_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.batch_timeout
+            while len(file_paths) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    file_paths.append(self.file_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self.pending_lock:
+                self.pending_files.difference_update(file_paths)
+            self.submit_files(file_paths)
+
+    def submit_files(self, file_paths):
+        self.upload_slots.acquire()
+        future = self.pool.submit(self.handle_dicom_files, file_paths)
+        future.add_done_callback(lambda _: self.upload_slots.release())
 
     def is_file_stable(self, file_path):
+        # Polling fallback for platforms without close-after-write events.
         previous_size = -1
         stable_time = 0
         while stable_time < self.stable_duration:
@@ -72,24 +355,40 @@ class DicomFileHandler(FileSystemEventHandler):
             time.sleep(self.check_interval)
         return True
 
-    def handle_dicom_file(self, file_path):
+    def find_api_endpoints(self, file_path):
         try:
-            ds = pydicom.dcmread(file_path)
-            study_description = getattr(ds, 'StudyDescription', '')
-            norm_study_description = normalize_string(study_description)
-            for config in self.configs:
-                norm_config_study_description = normalize_string(config['study_description'])
-                if norm_study_description == norm_config_study_description:
-                    self.send_to_api(file_path, config['api_endpoint'])
+            st = os.stat(file_path)
+            norm_study_description = _study_desc_for(file_path, (st.st_mtime_ns, st.st_size))
+            return self.endpoints_by_study_description.get(norm_study_description, ())
         except Exception as e:
             logging.error(f"Failed to process {file_path}: {e}")
+            return ()
+
+    def handle_dicom_files(self, file_paths):
+        files_by_endpoint = defaultdict(list)
+        for file_path in file_paths:
+            for api_endpoint in self.find_api_endpoints(file_path):
+                files_by_endpoint[api_endpoint].append(file_path)
+
+        for api_endpoint, endpoint_files in files_by_endpoint.items():
+            if len(endpoint_files) == 1:
+                self.send_to_api(endpoint_files[0], api_endpoint)
+            else:
+                self.send_batch_to_api(endpoint_files, api_endpoint)
 
     def send_to_api(self, file_path, api_endpoint):
         try:
-            files = {
-                'image': (os.path.basename(file_path), open(file_path, 'rb')),
-            }
-            response = requests.post(api_endpoint, files=files)
+            with open(file_path, 'rb') as f:
+                # Stream the file instead of building the whole body in memory.
+                encoder = MultipartEncoder(fields={
+                    'image': (os.path.basename(file_path), f, 'application/dicom'),
+                })
+                response = self.session.post(
+                    api_endpoint,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=(3.05, 30),
+                )
             if response.status_code == 200:
                 logging.info(f"Successfully sent {file_path} to API at {api_endpoint}.")
             else:
@@ -97,52 +396,159 @@ class DicomFileHandler(FileSystemEventHandler):
         except Exception as e:
             logging.error(f"Failed to send {file_path} to API: {e}")
 
+    def send_batch_to_api(self, file_paths, api_endpoint):
+        sent_files = []
+        try:
+            with contextlib.ExitStack() as stack:
+                fields = []
+                for file_path in file_paths:
+                    # A file removed since it was classified is skipped rather
+                    # than failing the whole batch.
+                    try:
+                        f = stack.enter_context(open(file_path, 'rb'))
+                    except OSError as e:
+                        logging.error(f"Failed to send {file_path} to API: {e}")
+                        continue
+                    fields.append((f'image_{len(fields)}', (os.path.basename(file_path), f, 'application/dicom')))
+                    sent_files.append(file_path)
+                if not fields:
+                    return
+                encoder = MultipartEncoder(fields=fields)
+                response = self.session.post(
+                    api_endpoint,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=(3.05, 30),
+                )
+            if response.status_code == 200:
+                logging.info(f"Successfully sent {len(sent_files)} files to API at {api_endpoint}.")
+            else:
+                logging.error(f"Failed to send {', '.join(sent_files)} to API at {api_endpoint}. Status code: {response.status_code}")
+        except Exception as e:
+            logging.error(f"Failed to send {', '.join(sent_files or file_paths)} to API at {api_endpoint}: {e}")
+
     def stop(self):
         self.stop_event.set()
         self.api_thread.join()
+        self.pool.shutdown(wait=True, cancel_futures=False)
+        self.session.close()
 
 
 class DicomFileDeleter:
     def __init__(self, watch_dirs, max_age_days=14, check_interval=86400):
         self.watch_dirs = watch_dirs
-        self.max_age_days = max_age_days
+        self.max_age_seconds = max_age_days * 86400.0
         self.check_interval = check_interval
         self.stop_event = threading.Event()
         logging.info(f"Watching directories for deleting old DICOM files: {watch_dirs}")
 
     def delete_old_files(self):
         while not self.stop_event.is_set():
-            now = datetime.now()
+            # mtimes are wall-clock timestamps, so the cutoff must come from
+            # time.time() rather than time.monotonic().
+            cutoff = time.time() - self.max_age_seconds
+            deleted = 0
             try:
                 for watch_dir in self.watch_dirs:
-                    for root, _, files in os.walk(watch_dir):
-                        for file_name in files:
-                            if file_name.lower().endswith(".dcm"):
-                                file_path = os.path.join(root, file_name)
-                                modified_time = datetime.fromtimestamp(
-                                    os.path.getmtime(file_path)
-                                )
-                                if now - modified_time > timedelta(
-                                    days=self.max_age_days
-                                ):
-                                    self.delete_file(file_path)
+                    if _HAVE_DIR_FD:
+                        deleted += self.sweep_dir_fd(watch_dir, cutoff)
+                    else:
+                        deleted += self.sweep(watch_dir, cutoff)
             except Exception as e:
                 logging.error(f"Failed to delete old DICOM files: {e}")
+            logging.info(f"Deleted {deleted} old DICOM files.")
 
             self.stop_event.wait(self.check_interval)
 
-    def delete_file(self, file_path):
+    def sweep(self, watch_dir, cutoff):
+        deleted = 0
+        for entry in _iter_dicom_files(watch_dir):
+            mode, mtime = _entry_mode_mtime(entry)
+            if stat.S_ISREG(mode) and mtime < cutoff and self.delete_file(entry.path):
+                deleted += 1
+        return deleted
+
+    def sweep_dir_fd(self, watch_dir, cutoff):
         try:
-            os.remove(file_path)
-            logging.info(f"Deleted DICOM file: {file_path}")
+            dir_fd = os.open(watch_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError as e:
+            logging.error(f"Failed to scan directory {watch_dir}: {e}")
+            return 0
+        try:
+            deleted, deleted_here = self.sweep_at(dir_fd, watch_dir, cutoff)
+            if deleted_here:
+                # The watch dir has no open parent, so it is removed by path.
+                try:
+                    self.remove_empty_dir(watch_dir, dir_fd)
+                except OSError as e:
+                    logging.error(f"Failed to remove directory {watch_dir}: {e}")
+            return deleted
+        finally:
+            os.close(dir_fd)
+
+    def sweep_at(self, dir_fd, dir_path, cutoff):
+        # Returns (files deleted under dir_path, files deleted directly in it).
+        with os.scandir(dir_fd) as it:
+            entries = list(it)
+        deleted = deleted_here = 0
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                entry_path = os.path.join(dir_path, entry.name)
+                try:
+                    child_fd = os.open(entry.name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+                except OSError as e:
+                    logging.error(f"Failed to scan directory {entry_path}: {e}")
+                    continue
+                try:
+                    child_deleted, child_deleted_here = self.sweep_at(child_fd, entry_path, cutoff)
+                    deleted += child_deleted
+                    if child_deleted_here:
+                        self.remove_empty_dir(entry_path, child_fd, parent_fd=dir_fd)
+                except Exception as e:
+                    logging.error(f"Failed to delete old DICOM files in {entry_path}: {e}")
+                finally:
+                    os.close(child_fd)
+            elif entry.name.lower().endswith('.dcm'):
+                try:
+                    # On an fd-based scandir this is fstatat against dir_fd.
+                    mode, mtime = _entry_mode_mtime(entry)
+                except OSError as e:
+                    logging.error(f"Failed to stat DICOM file {os.path.join(dir_path, entry.name)}: {e}")
+                    continue
+                if stat.S_ISREG(mode) and mtime < cutoff and self.delete_file(os.path.join(dir_path, entry.name), dir_fd):
+                    deleted_here += 1
+        return deleted + deleted_here, deleted_here
+
+    def delete_file(self, file_path, dir_fd=None):
+        # With dir_fd the file is unlinked relative to its open parent, and the
+        # caller removes that directory once it is done with it.
+        try:
+            if dir_fd is None:
+                os.remove(file_path)
+            else:
+                os.unlink(os.path.basename(file_path), dir_fd=dir_fd)
+        except Exception as e:
+            logging.error(f"Failed to delete DICOM file: {e}")
+            return False
+        logging.info(f"Deleted DICOM file: {file_path}")
 
+        if dir_fd is None:
             parent_dir = os.path.dirname(file_path)
-            if not os.listdir(parent_dir):
-                os.rmdir(parent_dir)
-                logging.info(f"Removed empty directory: {parent_dir}")
+            try:
+                self.remove_empty_dir(parent_dir)
+            except OSError as e:
+                logging.error(f"Failed to remove directory {parent_dir}: {e}")
+        return True
 
-        except Exception as e:
-            logging.error(f"Failed to delete DICOM file: {e}")
+    def remove_empty_dir(self, dir_path, dir_fd=None, parent_fd=None):
+        with os.scandir(dir_path if dir_fd is None else dir_fd) as it:
+            empty = next(it, None) is None
+        if empty:
+            if parent_fd is None:
+                os.rmdir(dir_path)
+            else:
+                os.rmdir(os.path.basename(dir_path), dir_fd=parent_fd)
+            logging.info(f"Removed empty directory: {dir_path}")
 
     def stop(self):
         self.stop_event.set()
@@ -157,9 +563,14 @@ def main():
     parser.add_argument('--logdir', type=str, default=default_log_dir, help=f'Directory to store log files (default: {default_log_dir})')
     parser.add_argument('--maxage', type=int, default=14, help='Maximum age of DICOM files in days to delete (default: 14)')
     parser.add_argument('--checkinterval', type=int, default=86400, help='Interval in seconds to check for outdated files (default: 86400 seconds or 1 day)')
-    parser.add_argument('--filecheckinterval', type=float, default=0.2, help='Interval in seconds to check if a file is stable (default: 0.2 seconds)')
-    parser.add_argument('--filestableduration', type=float, default=0.6, help='Duration in seconds for which a file should be stable (default: 0.6 seconds)')
-    parser.add_argument('--apicheckinterval', type=float, default=3, help='Interval in seconds to check for modified files to process (default: 3 seconds)')
+    parser.add_argument('--filecheckinterval', type=float, default=0.2, help='Interval in seconds to check if a file is stable when inotify is not used (default: 0.2 seconds)')
+    parser.add_argument('--filestableduration', type=float, default=0.6, help='Duration in seconds for which a file should be stable when inotify is not used (default: 0.6 seconds)')
+    # Accepted for compatibility with existing launchers; files are now
+    # processed as soon as they are queued.
+    parser.add_argument('--apicheckinterval', type=float, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--uploadworkers', type=int, default=8, help='Number of worker threads used to process and upload files (default: 8)')
+    parser.add_argument('--batchsize', type=int, default=1, help='Maximum number of files sent to an API in one request; values above 1 require API support (default: 1)')
+    parser.add_argument('--batchtimeout', type=float, default=0.1, help='Time in seconds to wait for more files when filling a batch (default: 0.1 seconds)')
     args = parser.parse_args()
 
     SETTINGS_FILE = args.settings
@@ -180,6 +591,9 @@ def main():
         ]
     )
 
+    if args.apicheckinterval is not None:
+        logging.warning("--apicheckinterval is deprecated and ignored; files are processed as soon as they are queued.")
+
     settings = load_settings(SETTINGS_FILE)
 
     if not settings:
@@ -187,9 +601,12 @@ def main():
         exit(1)
 
     watch_dirs = {config['watch_dir'] for config in settings}
-    event_handler = DicomFileHandler(settings, args.filecheckinterval, args.filestableduration, args.apicheckinterval)
+    observer, use_close_events = create_observer(watch_dirs)
+    event_handler = DicomFileHandler(settings, args.filecheckinterval, args.filestableduration,
+                                     upload_workers=args.uploadworkers,
+                                     batch_size=args.batchsize, batch_timeout=args.batchtimeout,
+                                     use_close_events=use_close_events)
 
-    observer = Observer()
     for watch_dir in watch_dirs:
         logging.info(f"Watching directory: {watch_dir}")
         observer.schedule(event_handler, path=watch_dir, recursive=True)
@@ -201,16 +618,26 @@ def main():
     delete_thread.daemon = True
     delete_thread.start()
 
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
+    def shutdown(signum, frame):
         observer.stop()
-        event_handler.stop()
-        deleter.stop()
-        delete_thread.join()
 
-    observer.join()
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    if sys.platform == 'win32':
+        # Lock waits cannot be interrupted by Ctrl+C on Windows, so wake up
+        # periodically to let the signal handler run.
+        while observer.is_alive():
+            observer.join(1)
+    else:
+        observer.join()
+
+    # The observer thread may also have exited on its own, so stop everything
+    # here rather than only from the signal handler.
+    observer.stop()
+    deleter.stop()
+    event_handler.stop()
+    delete_thread.join()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file